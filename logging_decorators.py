@@ -22,8 +22,13 @@ Usage Examples:
     @log_exceptions("Critical operation failed")
     def risky_operation():
         might_fail()
+
+Call tracing from log_function_calls is only wired in when the MOM0_TRACE
+environment variable is set to "1"; otherwise it returns the function
+undecorated so production calls pay nothing for it.
 """
 
+import os
 import functools
 import time
 import traceback
@@ -31,6 +36,9 @@ from typing import Any, Callable, Optional, Dict, List
 from logging_config import get_logger, log_exception
 
 
+LOG_DECORATE = os.getenv("MOM0_TRACE") == "1"
+
+
 def log_function_calls(
     include_params: bool = True,
     include_result: bool = True,
@@ -38,6 +46,9 @@ def log_function_calls(
 ):
     """
     Decorator to log function entry, exit, parameters, and return values.
+
+    A no-op unless MOM0_TRACE=1, since building the parameter and result
+    reprs on every call is too costly to leave on in production.
     
     Args
     ----
@@ -52,6 +63,9 @@ def log_function_calls(
             return processed_data
     """
     def decorator(func: Callable) -> Callable:
+        if not LOG_DECORATE:
+            return func
+        
         logger = get_logger(func.__module__)
         log_method = getattr(logger, log_level.lower())
         
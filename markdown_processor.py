@@ -327,7 +327,9 @@ class MarkdownProcessor:
 
                     total_facts += len(facts)
 
-                    # Add each fact to memory
+                    # Add each fact to memory. Facts from one entry are closely
+                    # related, and mem0 decides ADD/UPDATE/DELETE against the
+                    # user's existing memories, so they are added in order.
                     for fact in facts:
                         metadata = {}
                         if entry['timestamp']:
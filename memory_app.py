@@ -149,8 +149,10 @@ def chat_command(args):
                 
                 # Get chat response
                 print("🤔 Thinking...")
-                response = memory_manager.chat(user_input, args.user)
-                print(f"🤖 {response}")
+                print("🤖 ", end="", flush=True)
+                for chunk in memory_manager.chat_stream(user_input, args.user):
+                    print(chunk, end="", flush=True)
+                print()
                 print()
                 
             except KeyboardInterrupt:
@@ -5,16 +5,280 @@ This module provides the MemoryManager class that handles all memory operations
 including initialization, adding memories, searching, and chat functionality.
 """
 
+import os
+import re
+import asyncio
+import copy
+import math
+import mmap
 import json
 import time
+import random
+import functools
+import threading
+import httpx
+import numpy as np
 import requests
-from typing import Dict, Any, List, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from mem0 import Memory
 from pathlib import Path
 from logging_config import get_logger, log_exception
 from logging_decorators import log_function_calls, log_performance, log_exceptions, log_retry_attempts
 from prompt_manager import get_prompt
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:  # orjson is optional; stdlib json accepts bytes too
+    orjson = None
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+logger = get_logger(__name__)
+
+SEARCH_CACHE_SIZE = 512
+SEARCH_CACHE_TTL = 60.0
+OLLAMA_RETRY_STATUSES = (502, 503, 504)
+RETRY_BACKOFF_BASE = 0.2
+RETRY_BACKOFF_CAP = 8.0
+NON_RETRYABLE_ERRORS = (ValueError, TypeError, KeyError)
+RETRYABLE_CLIENT_STATUSES = (408, 429)
+SEARCH_PREFILTERS = ('keyword',)
+KEYWORD_CANDIDATE_FACTOR = 4
+RRF_K = 60
+MEMORY_LIST_LIMIT = 10000
+EMPTY_CORPUS_TTL = 30.0
+VECTOR_SCROLL_BATCH = 256
+USER_INDEX_CACHE_SIZE = 64
+VECTOR_CACHE_SIZE = 64
+VECTOR_CACHE_BYTES = 64 * 1024 * 1024
+JSON_HEADERS = {"Content-Type": "application/json"}
+NO_CONTEXT_TEMPLATE = "No specific information available about {user_id}."
+POST_FILTER_VECTOR_STORES = ('faiss',)
+# Default for search_memories(prefilter=...): use search_options.prefilter from the config
+CONFIGURED_PREFILTER = object()
+QUERY_STOPWORDS = frozenset({
+    'the', 'and', 'for', 'are', 'was', 'were', 'what', 'who', 'when', 'where',
+    'why', 'how', 'does', 'did', 'has', 'have', 'had', 'you', 'your', 'his',
+    'her', 'their', 'they', 'them', 'this', 'that', 'with', 'from', 'about',
+    'any', 'can', 'could', 'would', 'should', 'like', 'know', 'tell', 'mine'
+})
+
+
+def _normalize_query(query: str) -> str:
+    """
+    Normalize a search query so near-duplicate queries share a cache entry.
+
+    Args
+    ----
+    query: Raw search query
+
+    Returns
+    -------
+    Lowercased query with surrounding whitespace stripped and inner runs collapsed
+    """
+    return " ".join(query.lower().split())
+
+
+def _query_terms(text: str) -> frozenset:
+    """
+    Extract the discriminative keyword terms from a query or memory.
+
+    Args
+    ----
+    text: Query or memory text
+
+    Returns
+    -------
+    Lowercased word tokens of three or more characters, minus stopwords
+    """
+    return frozenset(
+        token for token in re.findall(r"\w+", text.lower())
+        if len(token) >= 3 and token not in QUERY_STOPWORDS
+    )
+
+
+def _reciprocal_rank_fusion(*rankings: List[Any], k: int = RRF_K) -> Dict[Any, float]:
+    """
+    Fuse several ranked ID lists with reciprocal-rank fusion.
+
+    Args
+    ----
+    rankings: Lists of IDs, each ordered best first
+    k: Damping constant; larger values flatten the contribution of top ranks
+
+    Returns
+    -------
+    Mapping of ID to fused score, higher is better
+    """
+    scores: Dict[Any, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, 1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return scores
+
+
+def _l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    """
+    Scale vectors to unit length along their last axis.
+
+    Args
+    ----
+    vectors: Vector or matrix of vectors
+
+    Returns
+    -------
+    Contiguous float32 array of unit vectors; zero vectors are left as zeros
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(vectors / norms)
+
+
+def _batch_cosine(query: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    Score every row of a pre-normalized matrix against a query in one BLAS call.
+
+    Args
+    ----
+    query: Query vector of shape (d,)
+    matrix: Unit-length candidate vectors of shape (n, d)
+
+    Returns
+    -------
+    Cosine similarities of shape (n,)
+    """
+    return matrix @ _l2_normalize(query)
+
+
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Return the indices of the k highest scores, best first.
+
+    Uses argpartition so only the k winners are sorted.
+
+    Args
+    ----
+    scores: 1-D array of scores
+    k: Number of indices to return
+
+    Returns
+    -------
+    Indices into scores ordered by descending score
+    """
+    if k >= len(scores):
+        return np.argsort(-scores)
+    top = np.argpartition(-scores, k)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def _epoch_cache(func: Any, maxsize: int) -> Any:
+    """
+    Wrap a per-user loader in an LRU cache keyed on the user's cache epoch.
+
+    The wrapper takes (user_id, epoch, *args) and calls func(user_id, *args).
+    The epoch only takes part in the key, so entries from an older epoch are
+    never looked up again and simply age out of the LRU.
+
+    Args
+    ----
+    func: Function taking the user ID as its first argument
+    maxsize: Maximum number of cached entries
+
+    Returns
+    -------
+    functools.lru_cache-wrapped function
+    """
+    @functools.lru_cache(maxsize=maxsize)
+    def cached(user_id: str, epoch: Tuple[int, int], *args: Any) -> Any:
+        return func(user_id, *args)
+    return cached
+
+
+def _is_retryable(error: Exception) -> bool:
+    """
+    Decide whether a failed memory operation is worth retrying.
+
+    Errors carrying an HTTP status are not retried for 4xx responses,
+    except 408 and 429. The status is read from error.status_code, as
+    raised by ollama.ResponseError and Qdrant's UnexpectedResponse, or from
+    error.response.status_code for requests/httpx errors. Validation-style
+    errors (ValueError, TypeError, KeyError) fail the same way on every
+    attempt. Everything else, such as connection and timeout errors, is
+    treated as transient.
+
+    Args
+    ----
+    error: Exception raised by the failed attempt
+
+    Returns
+    -------
+    True if the operation should be retried
+    """
+    status_code = getattr(error, 'status_code', None)
+    if status_code is None:
+        status_code = getattr(getattr(error, 'response', None), 'status_code', None)
+    if isinstance(status_code, int) and 400 <= status_code < 500:
+        return status_code in RETRYABLE_CLIENT_STATUSES
+    return not isinstance(error, NON_RETRYABLE_ERRORS)
+
+
+def _backoff_delay(attempt: int) -> float:
+    """
+    Compute an exponential backoff delay with full jitter.
+
+    Args
+    ----
+    attempt: Zero-based number of the attempt that just failed
+
+    Returns
+    -------
+    Seconds to sleep, drawn uniformly from [0, min(cap, base * 2**attempt)]
+    """
+    return random.uniform(0, min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * 2 ** attempt))
+
+
+@functools.lru_cache(maxsize=8)
+def _load_config_cached(config_path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """
+    Parse a JSON configuration file, memoized on its path and stat signature.
+
+    The modification time and size are part of the cache key so an edited
+    file is parsed again while unchanged files are only parsed once.
+
+    The file is memory-mapped and the parser reads straight from the mapped
+    pages. No intermediate Python buffer is filled, and worker processes
+    loading the same file share its page cache.
+
+    Args
+    ----
+    config_path: Absolute path to configuration file
+    mtime_ns: File modification time in nanoseconds
+    size: File size in bytes
+
+    Returns
+    -------
+    Parsed configuration dictionary (shared; callers must copy before mutating)
+    """
+    with open(config_path, 'rb') as f:
+        if size == 0:
+            # mmap cannot map an empty file; let the parser report it as invalid JSON
+            return _json_loads(b'')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if orjson is None:
+                return _json_loads(mapped[:])
+            with memoryview(mapped) as view:
+                return _json_loads(view)
+
 
 class MemoryManager:
     """
@@ -28,7 +292,6 @@ class MemoryManager:
     config: Configuration dictionary for memory setup
     memory: mem0 Memory instance
     user_id: Default user ID for memory operations
-    logger: Logger instance for this class
     
     Example
     -------
@@ -49,19 +312,150 @@ class MemoryManager:
         Raises
         ------
         FileNotFoundError: If config file doesn't exist
-        ValueError: If config is invalid
+        ValueError: If config is invalid or missing required LLM settings
+        RuntimeError: If memory initialization fails
         """
-        self.logger = get_logger(__name__)
         self.config = self._load_config(config_path)
         self.memory = None
         self.user_id = self.config.get('processing_options', {}).get('user_id', 'default')
+        self._resolve_options()
+        self._search_cached = _epoch_cache(self._search_rows, SEARCH_CACHE_SIZE)
+        self._term_index_cached = _epoch_cache(self._build_term_index, USER_INDEX_CACHE_SIZE)
+        self._vector_cache: OrderedDict = OrderedDict()
+        self._vector_cache_bytes = 0
+        self._vector_cache_lock = threading.Lock()
+        self._user_generations: Dict[str, int] = {}
+        self._generation_lock = threading.Lock()
+        self._no_context_cache: Dict[str, str] = {}
+        self._corpus_nonempty: Dict[str, Tuple[bool, float]] = {}
+        self._http = self._create_http_session()
+        self._async_http: Optional[httpx.AsyncClient] = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.config.get('processing_options', {}).get('ingest_concurrency', 1),
+            thread_name_prefix='memory-ingest'
+        )
         self._initialize_memory()
+
+    def _resolve_options(self):
+        """
+        Resolve chat, search and LLM settings used on every request into attributes.
+
+        Raises
+        ------
+        ValueError: If memory_config.llm.config or its model/ollama_base_url is missing,
+            or search_options.prefilter is not a known prefilter
+        """
+        chat_config = self.config.get('chat_options', {})
+        try:
+            llm_config = self.config['memory_config']['llm']['config']
+            self._model = llm_config['model']
+            self._ollama_base_url = llm_config['ollama_base_url']
+        except (KeyError, TypeError) as e:
+            error_msg = f"Invalid configuration: missing LLM setting {e}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        self._temperature = chat_config.get('temperature', 0.7)
+        self._timeout = chat_config.get('response_timeout', 60)
+        self._max_context_memories = chat_config.get('max_context_memories', 5)
+        self._search_prefilter = self.config.get('search_options', {}).get('prefilter')
+        if self._search_prefilter is not None and self._search_prefilter not in SEARCH_PREFILTERS:
+            error_msg = f"Invalid configuration: unknown search_options.prefilter {self._search_prefilter!r}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        self._quantization = self.config.get('search_options', {}).get('quantization')
+        self._num_predict = llm_config.get('max_tokens', 2000)
+
+    def _create_http_session(self) -> requests.Session:
+        """
+        Create a pooled HTTP session for Ollama API calls.
+
+        Reusing one session keeps the connection to Ollama alive between
+        chat requests instead of reconnecting for every prompt.
+
+        Returns
+        -------
+        Session with a keep-alive connection pool and retry policy mounted
+        """
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=OLLAMA_RETRY_STATUSES,
+            allowed_methods=frozenset({'POST'})
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _get_async_http(self) -> httpx.AsyncClient:
+        """
+        Return the async Ollama client, creating it on first use.
+
+        Synchronous callers never pay for an async connection pool.
+
+        Returns
+        -------
+        Pooled httpx.AsyncClient pointed at the Ollama base URL
+        """
+        if self._async_http is None:
+            self._async_http = httpx.AsyncClient(
+                base_url=self._ollama_base_url,
+                timeout=self._timeout,
+                limits=httpx.Limits(max_connections=16, max_keepalive_connections=8)
+            )
+        return self._async_http
+
+    def close(self):
+        """
+        Release pooled HTTP connections and stop the ingest worker threads.
+
+        An async client created by chat_async() is closed too when no event
+        loop is running; from inside a running loop use aclose() instead.
+        """
+        self._executor.shutdown(wait=True)
+        self._http.close()
+        if self._async_http is not None and not self._async_http.is_closed:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                try:
+                    asyncio.run(self._async_http.aclose())
+                except Exception as e:
+                    logger.debug("Async client connections not closed cleanly: %s", e)
+            else:
+                logger.warning("close() called from a running event loop; "
+                               "use aclose() to close the async client")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    async def aclose(self):
+        """
+        Close the async Ollama client, then release the synchronous resources.
+        """
+        if self._async_http is not None:
+            await self._async_http.aclose()
+        await asyncio.to_thread(self.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
     
     @log_exceptions("Configuration loading failed")
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """
         Load configuration from JSON file.
 
+        Parsed files are cached per process, so creating several managers
+        from the same unchanged file only parses it once.
+
         Args
         ----
         config_path: Path to configuration file
@@ -76,15 +470,17 @@ class MemoryManager:
         ValueError: If JSON is invalid
         """
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            self.logger.info(f"Configuration loaded from {config_path}")
+            stat = os.stat(config_path)
+            config = copy.deepcopy(
+                _load_config_cached(os.path.abspath(config_path), stat.st_mtime_ns, stat.st_size)
+            )
+            logger.info("Configuration loaded from %s", config_path)
             return config
         except FileNotFoundError:
-            self.logger.error(f"Configuration file not found: {config_path}")
+            logger.error("Configuration file not found: %s", config_path)
             raise FileNotFoundError(f"Configuration file not found: {config_path}")
         except json.JSONDecodeError as e:
-            self.logger.error(f"Invalid JSON in configuration file: {e}")
+            logger.error("Invalid JSON in configuration file: %s", e)
             raise ValueError(f"Invalid JSON in configuration file: {e}")
     
     @log_exceptions("Memory initialization failed")
@@ -93,24 +489,124 @@ class MemoryManager:
         """
         Initialize the mem0 Memory instance.
 
+        The configured vector store must apply the user_id filter inside the
+        index, not after scoring every user's vectors.
+
         Raises
         ------
-        RuntimeError: If memory initialization fails
+        RuntimeError: If memory initialization fails or the vector store
+            cannot pre-filter by user_id
         """
         try:
             memory_config = self.config['memory_config']
+            provider = memory_config.get('vector_store', {}).get('provider')
+            if provider in POST_FILTER_VECTOR_STORES:
+                raise ValueError(
+                    f"Vector store '{provider}' filters by user_id after scoring every vector; "
+                    "use a store that supports metadata pre-filtering"
+                )
+            self._warn_if_unindexed(memory_config.get('vector_store', {}))
+            self._ollama_url = f"{self._ollama_base_url}/api/generate"
+            self._ollama_payload_base = {
+                "model": self._model,
+                "stream": True,
+                "options": {
+                    "temperature": self._temperature,
+                    "num_predict": self._num_predict
+                }
+            }
+            # Serialized once; each request only appends the JSON-encoded prompt
+            self._ollama_payload_prefix = _json_dumps(self._ollama_payload_base)[:-1] + b',"prompt":'
             self.memory = Memory.from_config(memory_config)
-            self.logger.info("✅ Memory initialized successfully")
+            logger.info("✅ Memory initialized successfully")
         except Exception as e:
             error_msg = f"Failed to initialize memory: {e}"
-            self.logger.error(error_msg)
-            log_exception(self.logger, e, "Memory initialization")
+            logger.error(error_msg)
+            log_exception(logger, e, "Memory initialization")
             raise RuntimeError(error_msg)
+        self._apply_quantization(memory_config.get('vector_store', {}))
     
+    def _warn_if_unindexed(self, vector_store: Dict[str, Any]):
+        """
+        Warn when the vector store is configured to brute-force scan.
+
+        Qdrant and Chroma always search through an HNSW graph. mem0 builds a
+        DiskANN index for pgvector by default (diskann=True, hnsw=False), so
+        pgvector only brute-forces when both are disabled.
+
+        Args
+        ----
+        vector_store: The memory_config['vector_store'] section
+        """
+        store_config = vector_store.get('config', {})
+        if vector_store.get('provider') == 'pgvector' and not (
+                store_config.get('hnsw', False) or store_config.get('diskann', True)):
+            logger.warning(
+                "pgvector is configured without an ANN index, so every search scans all vectors; "
+                "set \"hnsw\": true in memory_config.vector_store.config or switch to qdrant/chroma (HNSW)"
+            )
+
+    def _apply_quantization(self, vector_store: Dict[str, Any]):
+        """
+        Enable int8 scalar quantization on the vector collection if configured.
+
+        With search_options.quantization set to "int8", Qdrant keeps an int8
+        copy of every vector in RAM and scans that (4x smaller than float32).
+        The top candidates are then rescored against the original float32
+        vectors. mem0 does not expose quantization in its own config, so it is
+        applied to the collection after mem0 has created it. Collections that
+        are already int8-quantized are left alone. Failures, including a
+        server that rejects the update (embedded Qdrant returns False), only
+        log a warning; search still works unquantized.
+
+        Args
+        ----
+        vector_store: The memory_config['vector_store'] section
+        """
+        if not self._quantization:
+            return
+
+        provider = vector_store.get('provider', 'qdrant')
+        if self._quantization != 'int8' or provider != 'qdrant':
+            logger.warning("Quantization %r is not supported for vector store %r; vectors stay float32",
+                           self._quantization, provider)
+            return
+
+        try:
+            from qdrant_client import models
+
+            store = self.memory.vector_store
+            current = store.client.get_collection(store.collection_name).config.quantization_config
+            if (isinstance(current, models.ScalarQuantization)
+                    and current.scalar.type == models.ScalarType.INT8):
+                logger.debug("Collection %s is already int8-quantized", store.collection_name)
+                return
+
+            updated = store.client.update_collection(
+                collection_name=store.collection_name,
+                quantization_config=models.ScalarQuantization(
+                    scalar=models.ScalarQuantizationConfig(
+                        type=models.ScalarType.INT8,
+                        quantile=0.99,
+                        always_ram=True
+                    )
+                )
+            )
+            if updated is False:
+                logger.warning("Qdrant did not apply int8 quantization to %s; vectors stay float32",
+                               store.collection_name)
+                return
+            logger.info("✅ int8 scalar quantization enabled on %s", store.collection_name)
+        except Exception as e:
+            logger.warning("Failed to enable int8 quantization: %s", e)
+
     def add_fact(self, fact: str, user_id: Optional[str] = None, 
                  metadata: Optional[Dict] = None, max_retries: int = 3) -> Optional[Dict]:
         """
         Add a fact to memory with retry logic.
+
+        Transient failures are retried with exponential backoff and full
+        jitter; validation errors and 4xx responses fail immediately.
         
         Args
         ----
@@ -133,35 +629,95 @@ class MemoryManager:
         
         for attempt in range(max_retries):
             try:
-                self.logger.debug(f"Adding fact (attempt {attempt + 1}): '{fact}'")
+                logger.debug("Adding fact (attempt %d): %r", attempt + 1, fact)
                 result = self.memory.add(fact, user_id=user_id, metadata=metadata)
                 
                 if result and result.get('results'):
-                    self.logger.info(f"✅ Added: {result['results'][0]['memory']}")
+                    self._invalidate_search_caches(user_id)
+                    self._corpus_nonempty[user_id] = (True, time.monotonic())
+                    logger.info("✅ Added: %s", result['results'][0]['memory'])
                     return result
                 else:
-                    self.logger.warning(f"⚠️ No memory created from: '{fact}'")
+                    logger.warning("⚠️ No memory created from: %r", fact)
                     return result
                     
             except Exception as e:
-                self.logger.error(f"❌ Attempt {attempt + 1} failed: {str(e)}")
+                logger.error("❌ Attempt %d failed: %s", attempt + 1, e)
+                if not _is_retryable(e):
+                    logger.error("Not retrying non-retryable error: %s", type(e).__name__)
+                    return None
                 if attempt < max_retries - 1:
-                    self.logger.info(f"Retrying in 2 seconds...")
-                    time.sleep(2)
+                    delay = _backoff_delay(attempt)
+                    logger.info("Retrying in %.2f seconds...", delay)
+                    time.sleep(delay)
                 else:
-                    self.logger.error(f"Failed after {max_retries} attempts")
+                    logger.error("Failed after %d attempts", max_retries)
                     return None
     
+    def add_facts(self, facts: List[str], user_id: Optional[str] = None,
+                  metadata: Optional[Dict] = None, max_retries: int = 3) -> List[Optional[Dict]]:
+        """
+        Add several facts to memory on the ingest thread pool.
+
+        Each fact goes through add_fact() on a pool whose size is set by
+        processing_options.ingest_concurrency (default 1, i.e. in order).
+        mem0 reads the user's existing memories and lets the LLM choose
+        ADD/UPDATE/DELETE before writing. Concurrent adds of related facts for
+        the same user can therefore race into duplicates or lost updates, so
+        only raise the concurrency for facts that are independent of each
+        other.
+
+        Args
+        ----
+        facts: Factual statements to add
+        user_id: User ID (defaults to configured user_id)
+        metadata: Optional metadata dictionary applied to every fact
+        max_retries: Maximum retry attempts per fact
+
+        Returns
+        -------
+        Results from add_fact(), in the same order as facts
+
+        Example
+        -------
+            >>> results = manager.add_facts(["Bruce likes pizza", "Bruce lives in NYC"], "bruce")
+            >>> len(results)
+            2
+        """
+        # mem0 may annotate the metadata it is given, so each fact gets its own copy
+        return list(self._executor.map(
+            lambda fact: self.add_fact(fact, user_id, dict(metadata) if metadata else metadata, max_retries),
+            facts
+        ))
+
     def search_memories(self, query: str, user_id: Optional[str] = None, 
-                       limit: int = 5) -> Optional[Dict]:
+                       limit: int = 5, prefilter: Any = CONFIGURED_PREFILTER) -> Optional[Dict]:
         """
         Search for relevant memories.
+
+        The user_id is always passed to the vector store as a filter so the
+        store only scores the user's own vectors.
+
+        Results are served from an LRU cache keyed on the user, the normalized
+        query, the limit and the prefilter, so repeated queries skip the
+        embedding round-trip. A user's entries are invalidated when this
+        manager adds or resets their memories, and expire after at most
+        SEARCH_CACHE_TTL seconds so writes from other processes show up.
+
+        With prefilter='keyword' the search runs in two levels: the user's
+        memories are first narrowed to those sharing a keyword with the query,
+        then the keyword and vector rankings are combined with reciprocal-rank
+        fusion, and the returned scores are the fused scores. Queries whose
+        keywords match fewer than limit memories use plain vector search.
         
         Args
         ----
         query: Search query
         user_id: User ID (defaults to configured user_id)
         limit: Maximum number of results
+        prefilter: None for plain vector search, or 'keyword' for two-level
+            retrieval (defaults to search_options.prefilter in the config;
+            pass None explicitly to skip a configured prefilter)
         
         Returns
         -------
@@ -174,178 +730,949 @@ class MemoryManager:
             3
         """
         user_id = user_id or self.user_id
+        if prefilter is CONFIGURED_PREFILTER:
+            prefilter = self._search_prefilter
+        if prefilter is not None and prefilter not in SEARCH_PREFILTERS:
+            raise ValueError(f"Unknown search prefilter: {prefilter!r}")
         
         try:
-            results = self.memory.search(query, user_id=user_id, limit=limit)
-            self.logger.debug(f"Search for '{query}' returned {len(results.get('results', []))} results")
-            return results
-        except Exception as e:
-            self.logger.error(f"Search failed: {e}")
-            return None
-    
-    def get_all_memories(self, user_id: Optional[str] = None) -> Optional[Dict]:
-        """
-        Get all memories for a user.
-        
-        Args
-        ----
-        user_id: User ID (defaults to configured user_id)
-        
-        Returns
-        -------
-        All memories dictionary or None if failed
-        """
-        user_id = user_id or self.user_id
-        
-        try:
-            results = self.memory.get_all(user_id=user_id)
-            self.logger.debug(f"Retrieved {len(results.get('results', []))} total memories")
-            return results
+            rows = self._search_cached(user_id, self._cache_epoch(user_id), _normalize_query(query),
+                                       limit, prefilter)
+            logger.debug("Search for %r returned %d results", query, len(rows))
+            return {
+                'results': [
+                    {'id': memory_id, 'memory': memory, 'score': score}
+                    for memory_id, memory, score in rows
+                ]
+            }
         except Exception as e:
-            self.logger.error(f"Failed to get all memories: {e}")
+            logger.error("Search failed: %s", e)
             return None
-    
-    def reset_memories(self, user_id: Optional[str] = None) -> int:
+
+    def _search_rows(self, user_id: str, query: str, limit: int,
+                     prefilter: Optional[str] = None) -> Tuple[Tuple[Any, str, Optional[float]], ...]:
         """
-        Reset all memories for a user.
-        
+        Run a search and flatten the results into immutable rows.
+
         Args
         ----
-        user_id: User ID (defaults to configured user_id)
-        
+        user_id: User ID to search within
+        query: Normalized search query
+        limit: Maximum number of results
+        prefilter: None for plain vector search, or 'keyword'
+
         Returns
         -------
-        Number of memories deleted
+        Tuple of (memory_id, memory_text, score) rows, safe to cache
         """
-        user_id = user_id or self.user_id
-        
-        try:
-            self.logger.info(f"Resetting all memories for user '{user_id}'...")
-            all_memories = self.get_all_memories(user_id)
-            
-            if not all_memories or not all_memories.get('results'):
-                self.logger.info("No memories found to delete")
-                return 0
-            
-            deleted_count = 0
-            for memory in all_memories['results']:
-                try:
-                    self.memory.delete(memory_id=memory['id'])
-                    deleted_count += 1
-                except Exception as e:
-                    self.logger.error(f"Failed to delete memory {memory['id']}: {e}")
-            
-            self.logger.info(f"✅ Deleted {deleted_count} memories")
-            return deleted_count
-            
-        except Exception as e:
-            self.logger.error(f"Error during reset: {e}")
-            return 0
+        if prefilter == 'keyword':
+            rows = self._keyword_search_rows(user_id, query, limit)
+            if rows is not None:
+                return rows
+        return self._vector_search_rows(user_id, query, limit)
 
-    def chat(self, query: str, user_id: Optional[str] = None,
-             max_context_memories: Optional[int] = None) -> str:
+    def search_memories_batch(self, queries: List[str], user_id: Optional[str] = None,
+                              limit: int = 5) -> List[Optional[Dict]]:
         """
-        Chat with memories using LLM.
+        Search for the memories relevant to several queries at once.
+
+        When the vector store surfaces raw vectors, the user's unit-normalized
+        memory matrix V is loaded once, all queries are embedded into Q, and
+        every query is scored in a single Q @ V.T matrix product. Otherwise
+        each query goes through search_memories() (and its cache).
 
         Args
         ----
-        query: User's question or message
+        queries: Search queries
         user_id: User ID (defaults to configured user_id)
-        max_context_memories: Max memories to include as context
+        limit: Maximum number of results per query
 
         Returns
         -------
-        LLM response based on relevant memories
+        Search results dictionaries in the same order as queries; an entry
+        is None if that search failed
 
         Example
         -------
-            >>> response = manager.chat("What do I like to eat?", "bruce")
-            >>> "pizza" in response.lower()
-            True
+            >>> results = manager.search_memories_batch(["food", "work"], "bruce")
+            >>> len(results)
+            2
         """
         user_id = user_id or self.user_id
-        max_context_memories = max_context_memories or self.config.get('chat_options', {}).get('max_context_memories', 5)
-
-        try:
-            # Search for relevant memories
-            self.logger.debug(f"Searching for memories relevant to: '{query}'")
-            memories = self.search_memories(query, user_id, max_context_memories)
-
-            # Format context
-            if not memories or not memories.get('results'):
-                self.logger.debug("No relevant memories found")
-                context = f"No specific information available about {user_id}."
-            else:
-                memory_facts = [mem['memory'] for mem in memories['results']]
-                self.logger.debug(f"Found {len(memory_facts)} relevant memories")
-                context = f"Facts about {user_id}:\n" + "\n".join(f"• {fact}" for fact in memory_facts)
+        if not queries:
+            return []
 
-            # Get chat prompt from prompt manager
+        vectors = self._user_vectors(user_id)
+        if vectors is not None:
             try:
-                prompt = get_prompt('chat', 'user_interaction',
-                                  user_id=user_id,
-                                  context=context,
-                                  query=query)
+                ids, texts, matrix = vectors
+                query_matrix = _l2_normalize([
+                    self.memory.embedding_model.embed(_normalize_query(query), "search")
+                    for query in queries
+                ])
+                scores = query_matrix @ matrix.T
+                logger.debug("Batch search scored %d queries against %d memories", len(queries), len(ids))
+                return [
+                    {'results': [
+                        {'id': ids[i], 'memory': texts[i], 'score': float(row[i])}
+                        for i in _top_k_indices(row, limit)
+                    ]}
+                    for row in scores
+                ]
             except Exception as e:
-                self.logger.error(f"Failed to load chat prompt: {e}")
-                # Fallback to error response prompt
-                try:
-                    prompt = get_prompt('chat', 'error_response',
-                                      query=query,
-                                      error_message=str(e))
-                except Exception:
-                    # Ultimate fallback
-                    prompt = f"I apologize, but I'm having trouble processing your request: {query}"
-
-            # Get LLM response using direct Ollama API
-            return self._call_ollama_api(prompt)
+                logger.warning("Batch search failed, searching queries one by one: %s", e)
 
-        except Exception as e:
-            self.logger.error(f"Chat error: {e}")
-            return f"Sorry, I encountered an error: {str(e)}"
+        return [self.search_memories(query, user_id, limit) for query in queries]
 
-    def _call_ollama_api(self, prompt: str) -> str:
+    def _vector_search_rows(self, user_id: str, query: str,
+                            limit: int) -> Tuple[Tuple[Any, str, Optional[float]], ...]:
         """
-        Call Ollama API directly for LLM responses.
+        Run a plain vector search through mem0.
 
         Args
         ----
-        prompt: Prompt to send to the LLM
+        user_id: User ID to search within
+        query: Normalized search query
+        limit: Maximum number of results
 
         Returns
         -------
-        LLM response text
+        Tuple of (memory_id, memory_text, score) rows
+        """
+        results = self.memory.search(query, user_id=user_id, limit=limit) or {}
+        return tuple(
+            (mem.get('id'), mem['memory'], mem.get('score'))
+            for mem in results.get('results', [])
+        )
 
-        Raises
-        ------
-        requests.RequestException: If API call fails
+    def _keyword_search_rows(self, user_id: str, query: str,
+                             limit: int) -> Optional[Tuple[Tuple[Any, str, float], ...]]:
         """
-        chat_config = self.config.get('chat_options', {})
-        memory_config = self.config['memory_config']['llm']['config']
-
-        ollama_url = f"{memory_config['ollama_base_url']}/api/generate"
-        payload = {
-            "model": memory_config['model'],
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": chat_config.get('temperature', 0.7),
-                "num_predict": memory_config.get('max_tokens', 2000)
-            }
-        }
+        Two-level search: keyword pre-filter, then vector rerank with RRF.
 
-        timeout = chat_config.get('response_timeout', 60)
+        Candidates are the user's memories sharing at least one query term,
+        looked up in the cached per-user term index and ranked by the summed
+        inverse document frequency of the shared terms so rare words dominate.
+        The candidates are then ranked by exact cosine similarity when the
+        store surfaces raw vectors, or else by a vector search widened to
+        KEYWORD_CANDIDATE_FACTOR times the limit and restricted to the
+        candidates. Both rankings are fused.
 
-        try:
-            response = requests.post(ollama_url, json=payload, timeout=timeout)
-            response.raise_for_status()
-            result = response.json()
+        Args
+        ----
+        user_id: User ID to search within
+        query: Normalized search query
+        limit: Maximum number of results
 
-            if 'response' in result:
-                return result['response'].strip()
-            else:
-                return "Sorry, I couldn't generate a response."
+        Returns
+        -------
+        Fused (memory_id, memory_text, score) rows, or None when the keywords
+        match fewer than limit memories and plain vector search should be used
+        """
+        terms = _query_terms(query)
+        if not terms:
+            return None
 
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"Ollama API error: {e}")
-            raise
+        ids, texts, postings = self._term_index_cached(user_id, self._cache_epoch(user_id))
+        idf = {
+            term: math.log((len(ids) + 1) / (len(postings.get(term, ())) + 0.5))
+            for term in terms
+        }
+        keyword_scores: Dict[int, float] = {}
+        for term in terms:
+            for position in postings.get(term, ()):
+                keyword_scores[position] = keyword_scores.get(position, 0.0) + idf[term]
+        if len(keyword_scores) < limit:
+            logger.debug("Keyword prefilter matched %d memories; using vector search", len(keyword_scores))
+            return None
+
+        # Ties keep the store's order so results do not depend on set iteration order
+        positions = sorted(keyword_scores, key=lambda position: (-keyword_scores[position], position))
+        keyword_ranking = [ids[position] for position in positions]
+        candidates = {memory_id: position for position, memory_id in zip(positions, keyword_ranking)}
+        vector_ranking = self._cosine_ranking(query, candidates, limit * KEYWORD_CANDIDATE_FACTOR)
+        if vector_ranking is None:
+            vector_rows = self._vector_search_rows(user_id, query, limit * KEYWORD_CANDIDATE_FACTOR)
+            # Only keyword candidates survive the pre-filter; the vector ranking reorders them
+            vector_ranking = [memory_id for memory_id, _, _ in vector_rows if memory_id in candidates]
+
+        fused = _reciprocal_rank_fusion(keyword_ranking, vector_ranking)
+        best = sorted(fused, key=fused.get, reverse=True)[:limit]
+        return tuple((memory_id, texts[candidates[memory_id]], fused[memory_id]) for memory_id in best)
+
+    def _build_term_index(self, user_id: str) -> Tuple[List[str], List[str], Dict[str, List[int]]]:
+        """
+        Build the keyword index over all of a user's memories.
+
+        Qdrant collections are paged through with scroll(); other stores are
+        read with get_all() up to MEMORY_LIST_LIMIT memories. Each memory is
+        tokenized once, and the index is cached for the user's cache epoch
+        (see _cache_epoch).
+
+        Args
+        ----
+        user_id: User ID whose memories to index
+
+        Returns
+        -------
+        Tuple of (memory IDs, memory texts, postings), where postings maps each
+        term to the positions of the memories containing it
+        """
+        points = None
+        provider = self.config['memory_config'].get('vector_store', {}).get('provider', 'qdrant')
+        if provider == 'qdrant':
+            try:
+                points = list(self._scroll_user_points(user_id, with_vectors=False))
+            except Exception as e:
+                logger.debug("Vector store scroll unavailable, using get_all: %s", e)
+
+        if points is not None:
+            ids = [str(point.id) for point in points]
+            texts = [(point.payload or {}).get('data', '') for point in points]
+        else:
+            all_memories = self.memory.get_all(user_id=user_id, limit=MEMORY_LIST_LIMIT) or {}
+            ids = [mem['id'] for mem in all_memories.get('results', [])]
+            texts = [mem['memory'] for mem in all_memories.get('results', [])]
+
+        postings: Dict[str, List[int]] = {}
+        for position, text in enumerate(texts):
+            for term in _query_terms(text):
+                postings.setdefault(term, []).append(position)
+        logger.debug("Indexed %d memories for user %r", len(ids), user_id)
+        return ids, texts, postings
+    
+    def _cosine_ranking(self, query: str, candidates: Dict[str, Any],
+                        limit: int) -> Optional[List[str]]:
+        """
+        Rank candidate memories by cosine similarity to the query with NumPy.
+
+        Only the candidates' vectors are fetched from Qdrant, by ID. They are
+        normalized into one (n, d) float32 matrix and scored with a single
+        matrix-vector product.
+
+        Args
+        ----
+        query: Normalized search query
+        candidates: Candidate memory IDs (any mapping or set of IDs)
+        limit: Maximum number of IDs to return
+
+        Returns
+        -------
+        Candidate IDs ordered by similarity, or None when the vector store
+        does not surface raw vectors
+        """
+        provider = self.config['memory_config'].get('vector_store', {}).get('provider', 'qdrant')
+        if provider != 'qdrant':
+            return None
+
+        try:
+            store = self.memory.vector_store
+            points = store.client.retrieve(
+                collection_name=store.collection_name,
+                ids=list(candidates),
+                with_payload=False,
+                with_vectors=True
+            )
+            ids = [str(point.id) for point in points]
+            vectors = [point.vector for point in points]
+        except Exception as e:
+            logger.debug("Raw vectors unavailable from vector store: %s", e)
+            return None
+        if not vectors:
+            return []
+
+        try:
+            query_vector = self.memory.embedding_model.embed(query, "search")
+        except Exception as e:
+            logger.debug("Query embedding unavailable, using vector store search: %s", e)
+            return None
+
+        scores = _batch_cosine(np.asarray(query_vector, dtype=np.float32), _l2_normalize(vectors))
+        return [ids[i] for i in _top_k_indices(scores, limit)]
+
+    def _user_vectors(self, user_id: str) -> Optional[Tuple[List[str], List[str], np.ndarray]]:
+        """
+        Load a user's memory vectors as a unit-normalized matrix.
+
+        Vectors are read from the Qdrant collection with a user_id filter,
+        normalized once and cached for the user's cache epoch (see
+        _cache_epoch). The cache keeps at most VECTOR_CACHE_SIZE entries and
+        VECTOR_CACHE_BYTES of matrices, evicting the least recently used.
+        Users without memories are cached too, so they are not scrolled on
+        every call. Failed reads are not cached.
+
+        Args
+        ----
+        user_id: User ID whose vectors to load
+
+        Returns
+        -------
+        Tuple of (memory IDs, memory texts, (n, d) float32 matrix), or None when the vector
+        store is not Qdrant, cannot be read directly or holds no vectors for the user
+        """
+        provider = self.config['memory_config'].get('vector_store', {}).get('provider', 'qdrant')
+        if provider != 'qdrant':
+            return None
+
+        key = (user_id, self._cache_epoch(user_id))
+        with self._vector_cache_lock:
+            if key in self._vector_cache:
+                self._vector_cache.move_to_end(key)
+                return self._vector_cache[key]
+
+        try:
+            vectors = self._load_user_vectors(user_id)
+        except Exception as e:
+            logger.debug("Raw vectors unavailable from vector store: %s", e)
+            return None
+
+        self._cache_user_vectors(key, vectors)
+        return vectors
+
+    def _cache_user_vectors(self, key: Tuple[str, Tuple[int, int]],
+                            vectors: Optional[Tuple[List[str], List[str], np.ndarray]]):
+        """
+        Store a user's vectors, replacing older epochs and evicting by size.
+
+        Args
+        ----
+        key: (user_id, cache epoch) the vectors were loaded for
+        vectors: Result of _load_user_vectors()
+        """
+        size = vectors[2].nbytes if vectors is not None else 0
+        if size > VECTOR_CACHE_BYTES:
+            logger.debug("Vector matrix of %d bytes exceeds the cache budget; not cached", size)
+            return
+
+        with self._vector_cache_lock:
+            for stale in [k for k in self._vector_cache if k[0] == key[0]]:
+                self._evict_user_vectors(stale)
+            self._vector_cache[key] = vectors
+            self._vector_cache_bytes += size
+            while (self._vector_cache_bytes > VECTOR_CACHE_BYTES
+                   or len(self._vector_cache) > VECTOR_CACHE_SIZE):
+                self._evict_user_vectors(next(iter(self._vector_cache)))
+
+    def _evict_user_vectors(self, key: Tuple[str, Tuple[int, int]]):
+        """
+        Drop one vector cache entry; the caller holds _vector_cache_lock.
+
+        Args
+        ----
+        key: (user_id, cache epoch) entry to drop
+        """
+        vectors = self._vector_cache.pop(key)
+        if vectors is not None:
+            self._vector_cache_bytes -= vectors[2].nbytes
+
+    def _load_user_vectors(self, user_id: str) -> Optional[Tuple[List[str], List[str], np.ndarray]]:
+        """
+        Scroll a user's vectors out of Qdrant and normalize them.
+
+        Args
+        ----
+        user_id: User ID whose vectors to load
+
+        Returns
+        -------
+        Tuple of (memory IDs, memory texts, (n, d) float32 matrix), or None
+        when the user has no vectors
+        """
+        ids, texts, vectors = [], [], []
+        for point in self._scroll_user_points(user_id, with_vectors=True):
+            ids.append(str(point.id))
+            texts.append((point.payload or {}).get('data', ''))
+            vectors.append(point.vector)
+
+        if not vectors:
+            return None
+        return ids, texts, _l2_normalize(vectors)
+
+    def _scroll_user_points(self, user_id: str, with_vectors: bool) -> Iterator[Any]:
+        """
+        Page through a user's points in the Qdrant collection.
+
+        Args
+        ----
+        user_id: User ID whose points to read
+        with_vectors: Whether to include each point's vector
+
+        Yields
+        ------
+        Qdrant points carrying the memory text under payload['data']
+        """
+        store = self.memory.vector_store
+        user_filter = self._user_filter(user_id)
+        offset = None
+        while True:
+            points, offset = store.client.scroll(
+                collection_name=store.collection_name,
+                scroll_filter=user_filter,
+                limit=VECTOR_SCROLL_BATCH,
+                offset=offset,
+                with_payload=['data'],
+                with_vectors=with_vectors
+            )
+            yield from points
+            if offset is None:
+                break
+
+    def _user_filter(self, user_id: str) -> Any:
+        """
+        Build the Qdrant filter matching a user's points.
+
+        Args
+        ----
+        user_id: User ID to match
+
+        Returns
+        -------
+        qdrant_client Filter on the user_id payload field
+        """
+        from qdrant_client import models
+
+        return models.Filter(must=[
+            models.FieldCondition(key='user_id', match=models.MatchValue(value=user_id))
+        ])
+
+    def _cache_epoch(self, user_id: str) -> Tuple[int, int]:
+        """
+        Return the cache epoch for a user's search results, term index and vectors.
+
+        The epoch pairs the user's write generation with a SEARCH_CACHE_TTL
+        time bucket. Entries are therefore dropped when this manager changes
+        the user's memories, and expire once the bucket rolls over. The
+        expiry picks up writes made by other processes or managers. Callers
+        read the epoch before searching, so a search that overlaps a write
+        caches its rows under the old generation, which is never read again.
+
+        Args
+        ----
+        user_id: User ID whose epoch to read
+
+        Returns
+        -------
+        Tuple of (write generation, time bucket)
+        """
+        return self._user_generations.get(user_id, 0), int(time.monotonic() // SEARCH_CACHE_TTL)
+
+    def _invalidate_search_caches(self, user_id: str):
+        """
+        Invalidate a user's cached search results, term index and vectors
+        after their memories change.
+
+        Args
+        ----
+        user_id: User ID whose memories changed
+        """
+        with self._generation_lock:
+            self._user_generations[user_id] = self._user_generations.get(user_id, 0) + 1
+
+    def get_all_memories(self, user_id: Optional[str] = None) -> Optional[Dict]:
+        """
+        Get all memories for a user.
+
+        The user_id is passed through to the vector store as a filter, so
+        only the user's own records are read.
+        
+        Args
+        ----
+        user_id: User ID (defaults to configured user_id)
+        
+        Returns
+        -------
+        All memories dictionary or None if failed
+        """
+        user_id = user_id or self.user_id
+        
+        try:
+            results = self.memory.get_all(user_id=user_id)
+            logger.debug("Retrieved %d total memories", len(results.get('results', ())))
+            return results
+        except Exception as e:
+            logger.error("Failed to get all memories: %s", e)
+            return None
+    
+    def reset_memories(self, user_id: Optional[str] = None) -> int:
+        """
+        Reset all memories for a user.
+
+        The user's memory IDs are listed without loading vectors or building
+        full memory records, which gives the deleted count. On Qdrant every
+        point matching the user_id filter is then removed in a single
+        server-side delete. Other stores go through mem0's delete_all(),
+        which only removes one page per call, or delete the listed memories
+        one by one; those passes repeat while a one-row listing still finds
+        memories and the previous pass made progress.
+        
+        Args
+        ----
+        user_id: User ID (defaults to configured user_id)
+        
+        Returns
+        -------
+        Number of memories deleted
+        """
+        user_id = user_id or self.user_id
+        
+        try:
+            logger.info("Resetting all memories for user %r...", user_id)
+            memory_ids = self._list_memory_ids(user_id)
+            
+            if not memory_ids:
+                logger.info("No memories found to delete")
+                return 0
+            
+            try:
+                if self._delete_user_points(user_id):
+                    deleted_count, remaining = len(memory_ids), []
+                else:
+                    deleted_count, remaining = self._delete_memory_pages(user_id, memory_ids)
+            finally:
+                self._invalidate_search_caches(user_id)
+
+            if remaining:
+                logger.error("Reset stalled with memories left for user %r", user_id)
+                self._corpus_nonempty.pop(user_id, None)
+            else:
+                self._corpus_nonempty[user_id] = (False, time.monotonic())
+            logger.info("✅ Deleted %d memories", deleted_count)
+            return deleted_count
+            
+        except Exception as e:
+            logger.error("Error during reset: %s", e)
+            return 0
+
+    def _delete_user_points(self, user_id: str) -> bool:
+        """
+        Delete all of a user's points from Qdrant with one filtered request.
+
+        Args
+        ----
+        user_id: User ID whose points to delete
+
+        Returns
+        -------
+        True if the points were deleted, False when the store is not Qdrant
+        or the filtered delete failed
+        """
+        provider = self.config['memory_config'].get('vector_store', {}).get('provider', 'qdrant')
+        if provider != 'qdrant':
+            return False
+
+        try:
+            from qdrant_client import models
+
+            store = self.memory.vector_store
+            store.client.delete(
+                collection_name=store.collection_name,
+                points_selector=models.FilterSelector(filter=self._user_filter(user_id))
+            )
+            return True
+        except Exception as e:
+            logger.warning("Filtered delete failed, deleting through mem0: %s", e)
+            return False
+
+    def _delete_memory_pages(self, user_id: str, memory_ids: List[str]) -> Tuple[int, List[str]]:
+        """
+        Delete a user's memories through mem0 until none are left.
+
+        Args
+        ----
+        user_id: User ID whose memories to delete
+        memory_ids: IDs from the initial listing
+
+        Returns
+        -------
+        Tuple of (number of memories deleted, IDs still present when a pass
+        made no progress)
+        """
+        if not hasattr(self.memory, 'delete_all'):
+            deleted_count = 0
+            while True:
+                removed = self._delete_memories(memory_ids)
+                deleted_count += removed
+                if not self._list_memory_ids(user_id, limit=1):
+                    return deleted_count, []
+                if not removed:
+                    return deleted_count, self._list_memory_ids(user_id)
+                # Memories beyond the MEMORY_LIST_LIMIT of the previous listing
+                memory_ids = self._list_memory_ids(user_id)
+
+        previous = None
+        while True:
+            self.memory.delete_all(user_id=user_id)
+            leftover = self._list_memory_ids(user_id, limit=1)
+            if not leftover:
+                return len(memory_ids), []
+            if leftover == previous:
+                remaining = self._list_memory_ids(user_id)
+                return len(set(memory_ids) - set(remaining)), remaining
+            previous = leftover
+
+    def _list_memory_ids(self, user_id: str, limit: int = MEMORY_LIST_LIMIT) -> List[str]:
+        """
+        List the IDs of a user's memories without loading their vectors.
+
+        Queries the vector store directly with a user_id filter, which skips
+        the record formatting done by get_all(). Falls back to get_all() when
+        the store cannot be listed this way.
+
+        Args
+        ----
+        user_id: User ID whose memory IDs to list
+        limit: Maximum number of IDs to list
+
+        Returns
+        -------
+        Memory IDs owned by the user
+        """
+        try:
+            points = self.memory.vector_store.list(
+                filters={'user_id': user_id}, limit=limit
+            )[0]
+            return [str(point.id) for point in points]
+        except Exception as e:
+            logger.debug("Vector store listing unavailable, using get_all: %s", e)
+            all_memories = self.memory.get_all(user_id=user_id, limit=limit) or {}
+            return [memory['id'] for memory in all_memories.get('results', [])]
+
+    def _delete_memories(self, memory_ids: List[str]) -> int:
+        """
+        Delete memories one at a time for backends without bulk delete.
+
+        Args
+        ----
+        memory_ids: IDs of the memories to delete
+
+        Returns
+        -------
+        Number of memories deleted
+        """
+        deleted_count = 0
+        for memory_id in memory_ids:
+            try:
+                self.memory.delete(memory_id=memory_id)
+                deleted_count += 1
+            except Exception as e:
+                logger.error("Failed to delete memory %s: %s", memory_id, e)
+        return deleted_count
+
+    def chat(self, query: str, user_id: Optional[str] = None,
+             max_context_memories: Optional[int] = None) -> str:
+        """
+        Chat with memories using LLM.
+
+        Args
+        ----
+        query: User's question or message
+        user_id: User ID (defaults to configured user_id)
+        max_context_memories: Max memories to include as context
+
+        Returns
+        -------
+        LLM response based on relevant memories
+
+        Example
+        -------
+            >>> response = manager.chat("What do I like to eat?", "bruce")
+            >>> "pizza" in response.lower()
+            True
+        """
+        try:
+            prompt = self._build_chat_prompt(query, user_id, max_context_memories)
+
+            # Get LLM response using direct Ollama API
+            return self._call_ollama_api(prompt)
+
+        except Exception as e:
+            logger.error("Chat error: %s", e)
+            return f"Sorry, I encountered an error: {str(e)}"
+
+    async def chat_async(self, query: str, user_id: Optional[str] = None,
+                         max_context_memories: Optional[int] = None) -> str:
+        """
+        Chat with memories without blocking the event loop.
+
+        The memory search runs in a worker thread and the Ollama call is
+        awaited on the shared async client, so one event loop can serve many
+        concurrent chats.
+
+        Args
+        ----
+        query: User's question or message
+        user_id: User ID (defaults to configured user_id)
+        max_context_memories: Max memories to include as context
+
+        Returns
+        -------
+        LLM response based on relevant memories
+
+        Example
+        -------
+            >>> response = await manager.chat_async("What do I like to eat?", "bruce")
+        """
+        try:
+            prompt = await asyncio.to_thread(self._build_chat_prompt, query, user_id, max_context_memories)
+            return await self._call_ollama_api_async(prompt)
+
+        except Exception as e:
+            logger.error("Chat error: %s", e)
+            return f"Sorry, I encountered an error: {str(e)}"
+
+    def chat_stream(self, query: str, user_id: Optional[str] = None,
+                    max_context_memories: Optional[int] = None) -> Iterator[str]:
+        """
+        Chat with memories, yielding the LLM response as it is generated.
+
+        Args
+        ----
+        query: User's question or message
+        user_id: User ID (defaults to configured user_id)
+        max_context_memories: Max memories to include as context
+
+        Yields
+        ------
+        Response text chunks in generation order
+
+        Example
+        -------
+            >>> for chunk in manager.chat_stream("What do I like to eat?", "bruce"):
+            ...     print(chunk, end="", flush=True)
+        """
+        try:
+            prompt = self._build_chat_prompt(query, user_id, max_context_memories)
+            yield from self._call_ollama_api_stream(prompt)
+
+        except Exception as e:
+            logger.error("Chat error: %s", e)
+            yield f"Sorry, I encountered an error: {str(e)}"
+
+    def _build_chat_prompt(self, query: str, user_id: Optional[str] = None,
+                           max_context_memories: Optional[int] = None) -> str:
+        """
+        Build the chat prompt from the memories relevant to a query.
+
+        Args
+        ----
+        query: User's question or message
+        user_id: User ID (defaults to configured user_id)
+        max_context_memories: Max memories to include as context
+
+        Returns
+        -------
+        Prompt text ready to send to the LLM
+        """
+        user_id = user_id or self.user_id
+        max_context_memories = max_context_memories or self._max_context_memories
+
+        # Search for relevant memories, unless the user is known to have none
+        if self._has_memories(user_id):
+            logger.debug("Searching for memories relevant to: %r", query)
+            memories = self.search_memories(query, user_id, max_context_memories)
+        else:
+            logger.debug("User %r has no memories; skipping search", user_id)
+            memories = None
+
+        # Format context
+        if not memories or not memories.get('results'):
+            logger.debug("No relevant memories found")
+            context = self._no_context(user_id)
+        else:
+            logger.debug("Found %d relevant memories", len(memories['results']))
+            context = f"Facts about {user_id}:\n" + "\n".join(f"• {mem['memory']}" for mem in memories['results'])
+
+        # Get chat prompt from prompt manager
+        try:
+            return get_prompt('chat', 'user_interaction',
+                              user_id=user_id,
+                              context=context,
+                              query=query)
+        except Exception as e:
+            logger.error("Failed to load chat prompt: %s", e)
+            # Fallback to error response prompt
+            try:
+                return get_prompt('chat', 'error_response',
+                                  query=query,
+                                  error_message=str(e))
+            except Exception:
+                # Ultimate fallback
+                return f"I apologize, but I'm having trouble processing your request: {query}"
+
+    def _has_memories(self, user_id: str) -> bool:
+        """
+        Check whether a user has any memories, caching the answer per user.
+
+        The check lists at most one memory ID. A positive answer is kept, and
+        add_fact() and reset_memories() update the cached answer. An empty
+        answer is only trusted for EMPTY_CORPUS_TTL seconds, because another
+        process or manager may add memories for the user in the meantime.
+        When the check itself fails, the answer is not cached and the search
+        goes ahead.
+
+        Args
+        ----
+        user_id: User ID to check
+
+        Returns
+        -------
+        False only when the user is known to have no memories
+        """
+        cached = self._corpus_nonempty.get(user_id)
+        if cached is not None:
+            nonempty, checked_at = cached
+            if nonempty or time.monotonic() - checked_at < EMPTY_CORPUS_TTL:
+                return nonempty
+
+        try:
+            points = self.memory.vector_store.list(filters={'user_id': user_id}, limit=1)[0]
+            nonempty = bool(points)
+        except Exception:
+            all_memories = self.get_all_memories(user_id)
+            if all_memories is None:
+                return True
+            nonempty = bool(all_memories.get('results'))
+
+        self._corpus_nonempty[user_id] = (nonempty, time.monotonic())
+        return nonempty
+
+    def _no_context(self, user_id: str) -> str:
+        """
+        Return the chat context used when no memories match, cached per user.
+
+        Args
+        ----
+        user_id: User ID the chat is about
+
+        Returns
+        -------
+        Context text stating that nothing is known about the user
+        """
+        context = self._no_context_cache.get(user_id)
+        if context is None:
+            context = self._no_context_cache[user_id] = NO_CONTEXT_TEMPLATE.format(user_id=user_id)
+        return context
+
+    def _call_ollama_api(self, prompt: str) -> str:
+        """
+        Call Ollama API directly for LLM responses.
+
+        Args
+        ----
+        prompt: Prompt to send to the LLM
+
+        Returns
+        -------
+        LLM response text
+
+        Raises
+        ------
+        requests.RequestException: If API call fails
+        """
+        chunks = list(self._call_ollama_api_stream(prompt))
+
+        if chunks:
+            return "".join(chunks).strip()
+        else:
+            return "Sorry, I couldn't generate a response."
+
+    def _call_ollama_api_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Call Ollama API with streaming enabled and yield response chunks.
+
+        Ollama streams one JSON object per line; each carries the next piece
+        of the generated text under 'response'.
+
+        Args
+        ----
+        prompt: Prompt to send to the LLM
+
+        Yields
+        ------
+        Response text chunks as they arrive
+
+        Raises
+        ------
+        requests.RequestException: If API call fails
+        """
+        payload = self._ollama_payload(prompt)
+
+        try:
+            response = self._http.post(self._ollama_url, data=payload, headers=JSON_HEADERS,
+                                       timeout=self._timeout, stream=True)
+            try:
+                response.raise_for_status()
+
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = _json_loads(line)
+                    if 'response' in chunk:
+                        yield chunk['response']
+                    if chunk.get('done'):
+                        break
+            finally:
+                response.close()
+
+        except requests.exceptions.RequestException as e:
+            logger.error("Ollama API error: %s", e)
+            raise
+
+    async def _call_ollama_api_async(self, prompt: str) -> str:
+        """
+        Call Ollama API on the async client and collect the streamed response.
+
+        Args
+        ----
+        prompt: Prompt to send to the LLM
+
+        Returns
+        -------
+        LLM response text
+
+        Raises
+        ------
+        httpx.HTTPError: If API call fails
+        """
+        chunks = []
+
+        try:
+            async with self._get_async_http().stream("POST", "/api/generate",
+                                                     content=self._ollama_payload(prompt),
+                                                     headers=JSON_HEADERS) as response:
+                response.raise_for_status()
+
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = _json_loads(line)
+                    if 'response' in chunk:
+                        chunks.append(chunk['response'])
+                    if chunk.get('done'):
+                        break
+
+        except httpx.HTTPError as e:
+            logger.error("Ollama API error: %s", e)
+            raise
+
+        if chunks:
+            return "".join(chunks).strip()
+        else:
+            return "Sorry, I couldn't generate a response."
+
+    def _ollama_payload(self, prompt: str) -> bytes:
+        """
+        Build the Ollama generate request body shared by the sync and async paths.
+
+        The model and options are pre-serialized in _initialize_memory, so only
+        the prompt is encoded per request.
+
+        Args
+        ----
+        prompt: Prompt to send to the LLM
+
+        Returns
+        -------
+        JSON-encoded request body
+        """
+        return self._ollama_payload_prefix + _json_dumps(prompt) + b'}'
@@ -85,6 +85,9 @@ def mock_memory_instance():
         }]
     }
     
+    # Mock ID-only listing from the vector store
+    mock_memory.vector_store.list.return_value = ([Mock(id='test-memory-id')], None)
+    
     # Mock delete operation
     mock_memory.delete.return_value = {'status': 'success'}
     
@@ -102,9 +105,10 @@ def mock_ollama_response():
     """
     mock_response = Mock()
     mock_response.status_code = 200
-    mock_response.json.return_value = {
-        'response': 'Test user likes pizza and works at a tech company.'
-    }
+    mock_response.iter_lines.return_value = [
+        b'{"response": "Test user likes pizza ", "done": false}',
+        b'{"response": "and works at a tech company.", "done": true}'
+    ]
     mock_response.raise_for_status.return_value = None
     return mock_response
 
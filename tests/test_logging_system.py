@@ -131,6 +131,20 @@ class TestLogFunctionCallsDecorator:
             failing_function()
 
 
+    def test_tracing_disabled_returns_function_unchanged(self):
+        """Test that call tracing is a no-op unless MOM0_TRACE is enabled."""
+        def plain_function():
+            return "plain"
+
+        with patch('logging_decorators.LOG_DECORATE', False):
+            assert log_function_calls()(plain_function) is plain_function
+
+        with patch('logging_decorators.LOG_DECORATE', True):
+            traced = log_function_calls()(plain_function)
+            assert traced is not plain_function
+            assert traced() == "plain"
+
+
 class TestLogPerformanceDecorator:
     """Test the log_performance decorator."""
     
@@ -143,7 +143,7 @@ class TestChatCommand:
         mock_manager_instance.get_all_memories.return_value = {
             'results': [{'id': '1', 'memory': 'Test memory', 'created_at': '2025-06-24'}]
         }
-        mock_manager_instance.chat.return_value = "Test response"
+        mock_manager_instance.chat_stream.return_value = iter(["Test ", "response"])
         mock_memory_manager.return_value = mock_manager_instance
         
         # Mock user input (ask question then exit)
@@ -159,7 +159,7 @@ class TestChatCommand:
         # Verify memory manager was initialized and used
         mock_memory_manager.assert_called_once_with(test_config_path)
         mock_manager_instance.get_all_memories.assert_called_with('test_user')
-        mock_manager_instance.chat.assert_called_with('What do I like?', 'test_user')
+        mock_manager_instance.chat_stream.assert_called_with('What do I like?', 'test_user')
         
         # Verify response was printed
         mock_print.assert_called()
@@ -183,7 +183,7 @@ class TestChatCommand:
         # Verify warning message was printed
         mock_print.assert_called()
         # Should not attempt to chat
-        mock_manager_instance.chat.assert_not_called()
+        mock_manager_instance.chat_stream.assert_not_called()
     
     @patch('memory_app.MemoryManager')
     @patch('builtins.input')
@@ -326,7 +326,7 @@ class TestIntegrationWorkflow:
         mock_manager_instance.get_all_memories.return_value = {
             'results': [{'id': '1', 'memory': 'User likes pizza', 'created_at': '2025-06-24'}]
         }
-        mock_manager_instance.chat.return_value = "You like pizza!"
+        mock_manager_instance.chat_stream.return_value = iter(["You like pizza!"])
         mock_memory_manager.return_value = mock_manager_instance
         
         # Mock markdown processor
@@ -355,7 +355,7 @@ class TestIntegrationWorkflow:
         
         # Verify both commands executed successfully
         mock_processor_instance.process_directories.assert_called_once()
-        mock_manager_instance.chat.assert_called_once_with('What do I like?', 'test_user')
+        mock_manager_instance.chat_stream.assert_called_once_with('What do I like?', 'test_user')
     
     @patch('memory_app.MarkdownProcessor')
     @patch('memory_app.MemoryManager')
@@ -13,10 +13,16 @@ This module tests the core memory management functionality including:
 
 import pytest
 import json
+import asyncio
+import httpx
+import numpy as np
+import requests
 import tempfile
+import time
 from unittest.mock import patch, Mock
 from datetime import datetime
 
+import memory_manager
 from memory_manager import MemoryManager
 
 
@@ -47,6 +53,28 @@ class TestMemoryManagerConfiguration:
             
             assert manager.user_id == 'custom_user'
     
+    def test_config_parsed_once_per_file_version(self, test_config_path):
+        """Test that unchanged config files are parsed once and copied per manager."""
+        with patch('memory_manager.Memory') as mock_memory, \
+                patch('memory_manager._json_loads', wraps=memory_manager._json_loads) as mock_load:
+            mock_memory.from_config.return_value = Mock()
+            memory_manager._load_config_cached.cache_clear()
+
+            first = MemoryManager(test_config_path)
+            second = MemoryManager(test_config_path)
+
+            assert mock_load.call_count == 1
+            assert first.config == second.config
+            assert first.config is not second.config
+
+    def test_chat_options_resolved_at_init(self, memory_manager_with_mocks):
+        """Test that chat and LLM settings are resolved into attributes."""
+        assert memory_manager_with_mocks._temperature == 0.7
+        assert memory_manager_with_mocks._timeout == 30
+        assert memory_manager_with_mocks._max_context_memories == 3
+        assert memory_manager_with_mocks._model == 'llama3.1:latest'
+        assert memory_manager_with_mocks._num_predict == 2000
+
     def test_config_file_not_found(self):
         """Test handling of missing configuration file."""
         with pytest.raises(FileNotFoundError):
@@ -61,6 +89,14 @@ class TestMemoryManagerConfiguration:
         with pytest.raises(ValueError):
             MemoryManager(config_path)
 
+    def test_empty_config_file(self):
+        """Test that an empty configuration file is reported as invalid JSON."""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            config_path = f.name
+
+        with pytest.raises(ValueError, match="Invalid JSON"):
+            MemoryManager(config_path)
+
 
 class TestMemoryManagerInitialization:
     """Test memory initialization."""
@@ -84,6 +120,137 @@ class TestMemoryManagerInitialization:
             with pytest.raises(RuntimeError, match="Failed to initialize memory"):
                 MemoryManager(test_config_path)
 
+    @pytest.mark.parametrize("remove", ['memory_config', 'model', 'ollama_base_url'])
+    def test_missing_llm_settings_rejected(self, test_config, remove):
+        """Test that a config without the LLM settings raises the documented ValueError."""
+        if remove == 'memory_config':
+            del test_config['memory_config']
+        else:
+            del test_config['memory_config']['llm']['config'][remove]
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(test_config, f)
+            config_path = f.name
+
+        with patch('memory_manager.Memory'):
+            with pytest.raises(ValueError, match="Invalid configuration"):
+                MemoryManager(config_path)
+
+    def test_unknown_configured_prefilter_rejected(self, test_config):
+        """Test that a misspelled search_options.prefilter fails at startup."""
+        test_config['search_options'] = {'prefilter': 'keywords'}
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(test_config, f)
+            config_path = f.name
+
+        with patch('memory_manager.Memory'):
+            with pytest.raises(ValueError, match="search_options.prefilter"):
+                MemoryManager(config_path)
+
+    def test_post_filter_vector_store_rejected(self, test_config):
+        """Test that vector stores without user_id pre-filtering are rejected."""
+        test_config['memory_config']['vector_store'] = {'provider': 'faiss', 'config': {}}
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(test_config, f)
+            config_path = f.name
+
+        with patch('memory_manager.Memory') as mock_memory:
+            with pytest.raises(RuntimeError, match="pre-filtering"):
+                MemoryManager(config_path)
+            mock_memory.from_config.assert_not_called()
+
+    def test_unindexed_pgvector_warns(self, test_config):
+        """Test that pgvector without an ANN index logs a recommendation."""
+        test_config['memory_config']['vector_store'] = {
+            'provider': 'pgvector', 'config': {'hnsw': False, 'diskann': False}
+        }
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(test_config, f)
+            config_path = f.name
+
+        with patch('memory_manager.Memory') as mock_memory, \
+                patch('memory_manager.logger') as mock_logger:
+            mock_memory.from_config.return_value = Mock()
+            MemoryManager(config_path)
+
+        warning = mock_logger.warning.call_args[0][0]
+        assert 'without an ANN index' in warning
+
+    def test_default_pgvector_index_does_not_warn(self, test_config):
+        """Test that pgvector with mem0's default DiskANN index is not reported as unindexed."""
+        test_config['memory_config']['vector_store'] = {'provider': 'pgvector', 'config': {}}
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(test_config, f)
+            config_path = f.name
+
+        with patch('memory_manager.Memory') as mock_memory, \
+                patch('memory_manager.logger') as mock_logger:
+            mock_memory.from_config.return_value = Mock()
+            MemoryManager(config_path)
+
+        mock_logger.warning.assert_not_called()
+
+    def test_int8_quantization_applied(self, test_config):
+        """Test that int8 quantization is enabled on the Qdrant collection."""
+        from qdrant_client import models
+
+        test_config['search_options'] = {'quantization': 'int8'}
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(test_config, f)
+            config_path = f.name
+
+        with patch('memory_manager.Memory') as mock_memory:
+            mock_instance = Mock()
+            mock_instance.vector_store.collection_name = 'test_memories'
+            mock_memory.from_config.return_value = mock_instance
+            MemoryManager(config_path)
+
+        update = mock_instance.vector_store.client.update_collection
+        update.assert_called_once()
+        assert update.call_args.kwargs['collection_name'] == 'test_memories'
+        scalar = update.call_args.kwargs['quantization_config'].scalar
+        assert scalar.type == models.ScalarType.INT8
+
+    def test_int8_quantization_not_reapplied(self, test_config):
+        """Test that an already int8-quantized collection is not updated again."""
+        from qdrant_client import models
+
+        test_config['search_options'] = {'quantization': 'int8'}
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(test_config, f)
+            config_path = f.name
+
+        with patch('memory_manager.Memory') as mock_memory:
+            mock_instance = Mock()
+            mock_instance.vector_store.client.get_collection.return_value.config.quantization_config = (
+                models.ScalarQuantization(scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8))
+            )
+            mock_memory.from_config.return_value = mock_instance
+            MemoryManager(config_path)
+
+        mock_instance.vector_store.client.update_collection.assert_not_called()
+
+    def test_int8_quantization_rejected_warns(self, test_config):
+        """Test that a rejected quantization update is reported instead of logged as enabled."""
+        test_config['search_options'] = {'quantization': 'int8'}
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(test_config, f)
+            config_path = f.name
+
+        with patch('memory_manager.Memory') as mock_memory, \
+                patch('memory_manager.logger') as mock_logger:
+            mock_instance = Mock()
+            mock_instance.vector_store.client.get_collection.return_value.config.quantization_config = None
+            mock_instance.vector_store.client.update_collection.return_value = False
+            mock_memory.from_config.return_value = mock_instance
+            MemoryManager(config_path)
+
+        assert 'did not apply int8 quantization' in mock_logger.warning.call_args[0][0]
+        assert not any('enabled' in call.args[0] for call in mock_logger.info.call_args_list)
+
+    def test_quantization_disabled_by_default(self, memory_manager_with_mocks):
+        """Test that the collection is left alone without a quantization option."""
+        memory_manager_with_mocks.memory.vector_store.client.update_collection.assert_not_called()
+
 
 class TestMemoryManagerFactOperations:
     """Test adding and managing facts."""
@@ -142,6 +309,83 @@ class TestMemoryManagerFactOperations:
         assert result is not None
         assert memory_manager_with_mocks.memory.add.call_count == 2
 
+    def test_add_fact_retry_backoff_is_jittered(self, memory_manager_with_mocks):
+        """Test that retries sleep for a jittered, exponentially growing delay."""
+        memory_manager_with_mocks.memory.add.side_effect = ConnectionError("Backend down")
+
+        with patch('time.sleep') as mock_sleep:
+            result = memory_manager_with_mocks.add_fact("Test fact", max_retries=3)
+
+        assert result is None
+        assert memory_manager_with_mocks.memory.add.call_count == 3
+        delays = [call.args[0] for call in mock_sleep.call_args_list]
+        assert len(delays) == 2
+        assert 0 <= delays[0] <= 0.2
+        assert 0 <= delays[1] <= 0.4
+
+    def test_add_fact_non_retryable_error(self, memory_manager_with_mocks):
+        """Test that validation errors are not retried."""
+        memory_manager_with_mocks.memory.add.side_effect = ValueError("Invalid metadata")
+
+        with patch('time.sleep') as mock_sleep:
+            result = memory_manager_with_mocks.add_fact("Test fact")
+
+        assert result is None
+        assert memory_manager_with_mocks.memory.add.call_count == 1
+        mock_sleep.assert_not_called()
+
+    def test_add_fact_client_errors_not_retried(self, memory_manager_with_mocks):
+        """Test that 4xx errors from the Ollama and Qdrant clients fail immediately."""
+        import ollama
+        from qdrant_client.http.exceptions import UnexpectedResponse
+
+        errors = [
+            ollama.ResponseError("model 'llama3.1' not found", 404),
+            UnexpectedResponse(400, "Bad Request", b"{}", httpx.Headers()),
+        ]
+        for error in errors:
+            memory_manager_with_mocks.memory.add.reset_mock()
+            memory_manager_with_mocks.memory.add.side_effect = error
+
+            with patch('time.sleep') as mock_sleep:
+                result = memory_manager_with_mocks.add_fact("Test fact")
+
+            assert result is None
+            assert memory_manager_with_mocks.memory.add.call_count == 1
+            mock_sleep.assert_not_called()
+
+    def test_retryable_status_codes(self):
+        """Test that 5xx, 408 and 429 responses are retried."""
+        import ollama
+
+        assert memory_manager._is_retryable(ollama.ResponseError("overloaded", 503))
+        assert memory_manager._is_retryable(ollama.ResponseError("slow down", 429))
+        assert memory_manager._is_retryable(ollama.ResponseError("unknown"))
+        assert not memory_manager._is_retryable(
+            requests.exceptions.HTTPError(response=Mock(status_code=401))
+        )
+
+    def test_add_facts_concurrently(self, memory_manager_with_mocks):
+        """Test adding several facts through the ingest thread pool."""
+        facts = ["Fact one", "Fact two", "Fact three"]
+        metadata = {"source": "test"}
+
+        results = memory_manager_with_mocks.add_facts(facts, "test_user", metadata=metadata)
+
+        assert len(results) == 3
+        assert all(result['results'] for result in results)
+        added = sorted(call.args[0] for call in memory_manager_with_mocks.memory.add.call_args_list)
+        assert added == sorted(facts)
+        for call in memory_manager_with_mocks.memory.add.call_args_list:
+            assert call.kwargs == {'user_id': 'test_user', 'metadata': metadata}
+
+    def test_close_shuts_down_executor(self, memory_manager_with_mocks):
+        """Test that close() stops the ingest thread pool."""
+        memory_manager_with_mocks.close()
+
+        with pytest.raises(RuntimeError):
+            memory_manager_with_mocks.add_facts(["Too late"])
+
 
 class TestMemoryManagerSearch:
     """Test memory search functionality."""
@@ -176,6 +420,240 @@ class TestMemoryManagerSearch:
             "test query", user_id="test_user", limit=5
         )
     
+    def test_search_memories_cached(self, memory_manager_with_mocks):
+        """Test that repeated and near-duplicate queries hit the search cache."""
+        first = memory_manager_with_mocks.search_memories("test query", "test_user")
+        second = memory_manager_with_mocks.search_memories("  Test   QUERY ", "test_user")
+
+        assert first == second
+        assert second['results'][0]['memory'] == 'Test memory content'
+        memory_manager_with_mocks.memory.search.assert_called_once()
+
+    def test_search_cache_cleared_on_add_fact(self, memory_manager_with_mocks):
+        """Test that adding a fact invalidates cached search results."""
+        memory_manager_with_mocks.search_memories("test query", "test_user")
+        memory_manager_with_mocks.add_fact("Test fact", "test_user")
+        memory_manager_with_mocks.search_memories("test query", "test_user")
+
+        assert memory_manager_with_mocks.memory.search.call_count == 2
+
+    def test_search_cache_is_per_user(self, memory_manager_with_mocks):
+        """Test that adding a fact only invalidates that user's cached searches."""
+        manager = memory_manager_with_mocks
+        manager.search_memories("test query", "other_user")
+        manager.add_fact("Test fact", "test_user")
+        manager.search_memories("test query", "other_user")
+
+        manager.memory.search.assert_called_once()
+
+    def test_search_cache_expires(self, memory_manager_with_mocks):
+        """Test that cached searches expire so writes from other processes show up."""
+        manager = memory_manager_with_mocks
+        manager.search_memories("test query", "test_user")
+
+        later = time.monotonic() + memory_manager.SEARCH_CACHE_TTL
+        with patch('memory_manager.time.monotonic', return_value=later):
+            manager.search_memories("test query", "test_user")
+
+        assert manager.memory.search.call_count == 2
+
+    def test_search_overlapping_add_not_served_from_cache(self, memory_manager_with_mocks):
+        """Test that rows from a search that overlapped an add are not served afterwards."""
+        manager = memory_manager_with_mocks
+        stale = {'results': [{'id': 'old', 'memory': 'Old memory', 'score': 0.9}]}
+        calls = []
+
+        def search(query, user_id, limit):
+            calls.append(query)
+            if len(calls) == 1:
+                manager.add_fact("Test fact", user_id)
+                return stale
+            return {'results': []}
+        manager.memory.search.side_effect = search
+
+        first = manager.search_memories("test query", "test_user")
+        second = manager.search_memories("test query", "test_user")
+
+        assert first['results'][0]['id'] == 'old'
+        assert second['results'] == []
+        assert len(calls) == 2
+
+    def test_search_memories_keyword_prefilter(self, memory_manager_with_mocks):
+        """Test two-level search fusing keyword and vector rankings."""
+        manager = memory_manager_with_mocks
+        manager.memory.get_all.return_value = {'results': [
+            {'id': 'pizza', 'memory': 'Loves pizza from Naples'},
+            {'id': 'hiking', 'memory': 'Enjoys hiking in the Alps'},
+            {'id': 'pasta', 'memory': 'Cooks pizza and pasta at home'},
+        ]}
+        manager.memory.search.return_value = {'results': [
+            {'id': 'hiking', 'memory': 'Enjoys hiking in the Alps', 'score': 0.9},
+            {'id': 'pizza', 'memory': 'Loves pizza from Naples', 'score': 0.8},
+        ]}
+
+        result = manager.search_memories("Pizza from Naples", "test_user", limit=2, prefilter='keyword')
+
+        assert [mem['id'] for mem in result['results']] == ['pizza', 'pasta']
+        manager.memory.search.assert_called_once_with(
+            "pizza from naples", user_id="test_user", limit=8
+        )
+
+    def test_search_memories_keyword_prefilter_cosine_rerank(self, memory_manager_with_mocks):
+        """Test that raw vectors from the store are reranked with NumPy."""
+        manager = memory_manager_with_mocks
+        manager.memory.get_all.return_value = {'results': [
+            {'id': 'pizza', 'memory': 'Loves pizza from Naples'},
+            {'id': 'pasta', 'memory': 'Cooks pizza and pasta at home'},
+            {'id': 'hiking', 'memory': 'Enjoys hiking in the Alps'},
+        ]}
+        points = {
+            'pizza': Mock(id='pizza', vector=[0.0, 1.0], payload={'data': 'Loves pizza from Naples'}),
+            'pasta': Mock(id='pasta', vector=[2.0, 0.1], payload={'data': 'Cooks pizza and pasta at home'}),
+            'hiking': Mock(id='hiking', vector=[1.0, 0.0], payload={'data': 'Enjoys hiking in the Alps'}),
+        }
+        client = manager.memory.vector_store.client
+        client.scroll.return_value = (list(points.values()), None)
+        client.retrieve.side_effect = lambda **kwargs: [points[memory_id] for memory_id in kwargs['ids']]
+        manager.memory.embedding_model.embed.return_value = [1.0, 0.0]
+
+        result = manager.search_memories("pizza", "test_user", limit=2, prefilter='keyword')
+
+        assert {mem['id'] for mem in result['results']} == {'pasta', 'pizza'}
+        manager.memory.search.assert_not_called()
+        manager.memory.embedding_model.embed.assert_called_once_with("pizza", "search")
+        # Only the keyword candidates' vectors are fetched; the scroll only reads payloads
+        assert sorted(client.retrieve.call_args.kwargs['ids']) == ['pasta', 'pizza']
+        assert client.retrieve.call_args.kwargs['with_vectors'] is True
+        assert [call.kwargs['with_vectors'] for call in client.scroll.call_args_list] == [False]
+        assert manager._cosine_ranking("pizza", {'pizza', 'pasta'}, 2) == ['pasta', 'pizza']
+
+    def test_keyword_index_pages_through_store_once(self, memory_manager_with_mocks):
+        """Test that the keyword index covers every scroll page and is cached per user."""
+        manager = memory_manager_with_mocks
+        first_page = [
+            Mock(id=f'hike-{i}', vector=[1.0, 0.0], payload={'data': 'Enjoys hiking'})
+            for i in range(150)
+        ]
+        second_page = [
+            Mock(id='pizza', vector=[0.0, 1.0], payload={'data': 'Loves pizza from Naples'}),
+            Mock(id='pasta', vector=[1.0, 1.0], payload={'data': 'Cooks pizza and pasta'}),
+        ]
+        pages = {None: (first_page, 'page-2'), 'page-2': (second_page, None)}
+        by_id = {point.id: point for point in first_page + second_page}
+        manager.memory.vector_store.client.scroll.side_effect = lambda **kwargs: pages[kwargs['offset']]
+        manager.memory.vector_store.client.retrieve.side_effect = (
+            lambda **kwargs: [by_id[memory_id] for memory_id in kwargs['ids']]
+        )
+        manager.memory.embedding_model.embed.return_value = [0.0, 1.0]
+
+        first = manager.search_memories("pizza", "test_user", limit=2, prefilter='keyword')
+        manager.search_memories("pizza naples", "test_user", limit=2, prefilter='keyword')
+
+        assert [mem['id'] for mem in first['results']] == ['pizza', 'pasta']
+        scrolls = manager.memory.vector_store.client.scroll.call_args_list
+        assert [call.kwargs['with_vectors'] for call in scrolls] == [False, False]
+        manager.memory.get_all.assert_not_called()
+
+        manager.add_fact("Likes pizza", "test_user")
+        manager.search_memories("pizza", "test_user", limit=2, prefilter='keyword')
+
+        assert manager.memory.vector_store.client.scroll.call_count == 4
+
+    def test_search_memories_batch(self, memory_manager_with_mocks):
+        """Test that a batch of queries is scored in one matrix product."""
+        manager = memory_manager_with_mocks
+        manager.memory.vector_store.client.scroll.return_value = ([
+            Mock(id='pizza', vector=[1.0, 0.0], payload={'data': 'Likes pizza'}),
+            Mock(id='work', vector=[0.0, 1.0], payload={'data': 'Works at TechCorp'}),
+        ], None)
+        manager.memory.embedding_model.embed.side_effect = [[0.0, 2.0], [3.0, 0.1]]
+
+        results = manager.search_memories_batch(["Where do I work?", "What do I eat?"], "test_user", limit=1)
+
+        assert [r['results'][0]['id'] for r in results] == ['work', 'pizza']
+        assert results[0]['results'][0]['memory'] == 'Works at TechCorp'
+        manager.memory.vector_store.client.scroll.assert_called_once()
+        manager.memory.search.assert_not_called()
+
+    def test_search_memories_batch_fallback(self, memory_manager_with_mocks):
+        """Test batch search falls back to per-query search without raw vectors."""
+        manager = memory_manager_with_mocks
+        manager.memory.vector_store.client.scroll.side_effect = Exception("unsupported")
+
+        results = manager.search_memories_batch(["first query", "second query"], "test_user")
+
+        assert len(results) == 2
+        assert manager.memory.search.call_count == 2
+
+    def test_user_vectors_cache_caches_empty_users(self, memory_manager_with_mocks):
+        """Test that users without vectors are not scrolled again on every call."""
+        manager = memory_manager_with_mocks
+        manager.memory.vector_store.client.scroll.return_value = ([], None)
+
+        assert manager._user_vectors("cold_user") is None
+        assert manager._user_vectors("cold_user") is None
+
+        manager.memory.vector_store.client.scroll.assert_called_once()
+
+    def test_user_vectors_cache_bounded_by_bytes(self, memory_manager_with_mocks):
+        """Test that vector matrices are evicted least recently used once over the byte budget."""
+        manager = memory_manager_with_mocks
+        manager.memory.vector_store.client.scroll.return_value = ([
+            Mock(id=f'memory-{i}', vector=[1.0] * 4, payload={'data': 'Fact'}) for i in range(8)
+        ], None)
+
+        # Each user's matrix is 8 x 4 float32 = 128 bytes; the budget fits two
+        with patch('memory_manager.VECTOR_CACHE_BYTES', 256):
+            for user_id in ("alice", "bob", "carol"):
+                manager._user_vectors(user_id)
+
+        assert [key[0] for key in manager._vector_cache] == ["bob", "carol"]
+        assert manager._vector_cache_bytes == 256
+
+        manager.add_fact("Bob likes tea", "bob")
+        manager._user_vectors("bob")
+
+        assert [key[0] for key in manager._vector_cache] == ["carol", "bob"]
+        assert manager._vector_cache_bytes == 256
+
+    def test_batch_cosine_top_k(self):
+        """Test the vectorized cosine scoring and top-k selection helpers."""
+        matrix = memory_manager._l2_normalize([[1.0, 0.0], [0.0, 3.0], [1.0, 1.0]])
+        scores = memory_manager._batch_cosine(np.array([2.0, 0.0]), matrix)
+
+        assert np.allclose(scores, [1.0, 0.0, np.sqrt(0.5)])
+        assert list(memory_manager._top_k_indices(scores, 2)) == [0, 2]
+        assert list(memory_manager._top_k_indices(scores, 5)) == [0, 2, 1]
+
+    def test_search_memories_keyword_prefilter_falls_back(self, memory_manager_with_mocks):
+        """Test that too few keyword candidates fall back to vector search."""
+        manager = memory_manager_with_mocks
+
+        result = manager.search_memories("unrelated words", "test_user", limit=5, prefilter='keyword')
+
+        assert result['results'][0]['id'] == 'test-memory-id'
+        manager.memory.search.assert_called_once_with(
+            "unrelated words", user_id="test_user", limit=5
+        )
+
+    def test_search_memories_prefilter_disabled_per_call(self, memory_manager_with_mocks):
+        """Test that prefilter=None skips a prefilter enabled in the config."""
+        manager = memory_manager_with_mocks
+        manager._search_prefilter = 'keyword'
+
+        manager.search_memories("pizza from naples", "test_user", limit=2, prefilter=None)
+
+        manager.memory.get_all.assert_not_called()
+        manager.memory.vector_store.client.scroll.assert_not_called()
+        manager.memory.search.assert_called_once_with(
+            "pizza from naples", user_id="test_user", limit=2
+        )
+
+    def test_search_memories_unknown_prefilter(self, memory_manager_with_mocks):
+        """Test that an unknown prefilter is rejected."""
+        with pytest.raises(ValueError, match="Unknown search prefilter"):
+            memory_manager_with_mocks.search_memories("test query", prefilter='fuzzy')
+
     def test_get_all_memories(self, memory_manager_with_mocks):
         """Test getting all memories for a user."""
         result = memory_manager_with_mocks.get_all_memories("test_user")
@@ -190,13 +668,16 @@ class TestMemoryManagerSearch:
 class TestMemoryManagerChat:
     """Test chat functionality."""
     
-    @patch('memory_manager.requests.post')
+    @patch('memory_manager.requests.Session.post')
     def test_chat_with_memories(self, mock_post, memory_manager_with_mocks):
         """Test chat functionality with relevant memories."""
         # Mock Ollama API response
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {'response': 'Test user likes pizza!'}
+        mock_response.iter_lines.return_value = [
+            b'{"response": "Test user ", "done": false}',
+            b'{"response": "likes pizza!", "done": true}'
+        ]
         mock_response.raise_for_status.return_value = None
         mock_post.return_value = mock_response
         
@@ -206,7 +687,7 @@ class TestMemoryManagerChat:
         memory_manager_with_mocks.memory.search.assert_called_once()
         mock_post.assert_called_once()
     
-    @patch('memory_manager.requests.post')
+    @patch('memory_manager.requests.Session.post')
     def test_chat_no_memories_found(self, mock_post, memory_manager_with_mocks):
         """Test chat when no relevant memories are found."""
         # Mock no search results
@@ -215,7 +696,9 @@ class TestMemoryManagerChat:
         # Mock Ollama API response
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {'response': 'I don\'t have information about that.'}
+        mock_response.iter_lines.return_value = [
+            b'{"response": "I don\'t have information about that.", "done": true}'
+        ]
         mock_response.raise_for_status.return_value = None
         mock_post.return_value = mock_response
         
@@ -223,47 +706,282 @@ class TestMemoryManagerChat:
         
         assert "don't have information" in result
     
-    @patch('memory_manager.requests.post')
+    def test_chat_prompt_context_formatting(self, memory_manager_with_mocks):
+        """Test the bulleted memory context and the cached no-memory context."""
+        manager = memory_manager_with_mocks
+        manager.memory.search.return_value = {'results': [
+            {'id': '1', 'memory': 'Likes pizza', 'score': 0.9},
+            {'id': '2', 'memory': 'Lives in NYC', 'score': 0.8},
+        ]}
+
+        prompt = manager._build_chat_prompt("What do I like?", "test_user")
+
+        assert "Facts about test_user:\n• Likes pizza\n• Lives in NYC" in prompt
+
+        manager.memory.search.return_value = {'results': []}
+        prompt = manager._build_chat_prompt("Where do I work?", "test_user")
+
+        assert "No specific information available about test_user." in prompt
+        assert manager._no_context_cache == {
+            'test_user': "No specific information available about test_user."
+        }
+
+    def test_chat_skips_search_for_empty_corpus(self, memory_manager_with_mocks):
+        """Test that users without memories skip the vector search."""
+        manager = memory_manager_with_mocks
+        manager.memory.vector_store.list.return_value = ([], None)
+
+        first = manager._build_chat_prompt("What do I like?", "test_user")
+        manager._build_chat_prompt("Where do I live?", "test_user")
+
+        assert "No specific information available about test_user." in first
+        manager.memory.search.assert_not_called()
+        manager.memory.vector_store.list.assert_called_once_with(
+            filters={'user_id': 'test_user'}, limit=1
+        )
+
+        manager.add_fact("Test user likes pizza", "test_user")
+        manager._build_chat_prompt("What do I like?", "test_user")
+
+        manager.memory.search.assert_called_once()
+
+    def test_reset_marks_corpus_empty(self, memory_manager_with_mocks):
+        """Test that a reset makes later chats skip the search."""
+        manager = memory_manager_with_mocks
+        manager.reset_memories("test_user")
+
+        manager._build_chat_prompt("What do I like?", "test_user")
+
+        manager.memory.search.assert_not_called()
+
+    def test_empty_corpus_answer_expires(self, memory_manager_with_mocks):
+        """Test that memories added elsewhere are found once the empty answer expires."""
+        manager = memory_manager_with_mocks
+        manager.memory.vector_store.list.return_value = ([], None)
+        manager._build_chat_prompt("What do I like?", "test_user")
+
+        # Another process ingests for the user; this manager's add_fact is never called
+        manager.memory.vector_store.list.return_value = ([Mock(id='test-memory-id')], None)
+        with patch('memory_manager.time.monotonic', return_value=time.monotonic() + 60):
+            manager._build_chat_prompt("What do I like?", "test_user")
+
+        manager.memory.search.assert_called_once()
+
+    @patch('memory_manager.requests.Session.post')
     def test_chat_pronoun_resolution_in_prompt(self, mock_post, memory_manager_with_mocks):
         """Test that chat prompt includes pronoun resolution instructions."""
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {'response': 'Test response'}
+        mock_response.iter_lines.return_value = [b'{"response": "Test response", "done": true}']
         mock_response.raise_for_status.return_value = None
         mock_post.return_value = mock_response
         
         memory_manager_with_mocks.chat("What do I like?", "test_user")
         
         # Check that the prompt includes pronoun resolution instructions
-        call_args = mock_post.call_args[1]['json']
+        call_args = json.loads(mock_post.call_args[1]['data'])
         prompt = call_args['prompt']
         assert 'When the user says "I", "me", "my", or "mine", they are referring to test_user' in prompt
         assert 'What do I like?' in prompt
 
+    @patch('memory_manager.requests.Session.post')
+    def test_chat_stream_yields_chunks(self, mock_post, memory_manager_with_mocks):
+        """Test that chat_stream yields response chunks as Ollama streams them."""
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.iter_lines.return_value = [
+            b'{"response": "You ", "done": false}',
+            b'',
+            b'{"response": "like pizza.", "done": true}'
+        ]
+        mock_post.return_value = mock_response
+
+        chunks = list(memory_manager_with_mocks.chat_stream("What do I like?", "test_user"))
+
+        assert chunks == ['You ', 'like pizza.']
+        assert mock_post.call_args[1]['stream'] is True
+        assert json.loads(mock_post.call_args[1]['data'])['stream'] is True
+        assert mock_post.call_args[1]['headers'] == {'Content-Type': 'application/json'}
+        mock_response.close.assert_called_once()
+
+    def test_ollama_payload_prerendered(self, memory_manager_with_mocks):
+        """Test that the pre-rendered payload matches a freshly built one."""
+        prompt = 'Say "hi" \u2022 twice\n'
+
+        payload = json.loads(memory_manager_with_mocks._ollama_payload(prompt))
+
+        assert payload == {
+            "model": "llama3.1:latest",
+            "stream": True,
+            "options": {"temperature": 0.7, "num_predict": 2000},
+            "prompt": prompt
+        }
+
+    def test_chat_async(self, memory_manager_with_mocks):
+        """Test async chat through the httpx client."""
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(json.loads(request.content))
+            return httpx.Response(200, content=(
+                b'{"response": "You like ", "done": false}\n'
+                b'{"response": "pizza.", "done": true}\n'
+            ))
+
+        async def run_chat():
+            manager = memory_manager_with_mocks
+            manager._async_http = httpx.AsyncClient(
+                base_url="http://ollama.test", transport=httpx.MockTransport(handler)
+            )
+            async with manager:
+                return await manager.chat_async("What do I like?", "test_user")
+
+        result = asyncio.run(run_chat())
+
+        assert result == 'You like pizza.'
+        assert requests_seen[0]['model'] == 'llama3.1:latest'
+        assert 'What do I like?' in requests_seen[0]['prompt']
+
+    def test_async_client_created_lazily_and_closed(self, memory_manager_with_mocks):
+        """Test that the async client only exists after async use and close() releases it."""
+        manager = memory_manager_with_mocks
+        assert manager._async_http is None
+
+        client = manager._get_async_http()
+        assert manager._get_async_http() is client
+
+        manager.close()
+
+        assert client.is_closed
+
+    def test_chat_async_api_error(self, memory_manager_with_mocks):
+        """Test that async chat reports Ollama errors instead of raising."""
+        async def run_chat():
+            manager = memory_manager_with_mocks
+            manager._async_http = httpx.AsyncClient(
+                base_url="http://ollama.test",
+                transport=httpx.MockTransport(lambda request: httpx.Response(500))
+            )
+            return await manager.chat_async("What do I like?", "test_user")
+
+        result = asyncio.run(run_chat())
+
+        assert result.startswith("Sorry, I encountered an error")
+
 
 class TestMemoryManagerReset:
     """Test memory reset functionality."""
     
     def test_reset_memories_success(self, memory_manager_with_mocks):
-        """Test successful memory reset."""
-        deleted_count = memory_manager_with_mocks.reset_memories("test_user")
+        """Test that a Qdrant reset deletes the user's points with one filtered request."""
+        from qdrant_client import models
+
+        manager = memory_manager_with_mocks
+        manager.memory.vector_store.collection_name = 'test_memories'
+
+        deleted_count = manager.reset_memories("test_user")
         
         assert deleted_count == 1
-        memory_manager_with_mocks.memory.get_all.assert_called_once_with(user_id="test_user")
-        memory_manager_with_mocks.memory.delete.assert_called_once_with(memory_id="test-memory-id")
+        manager.memory.vector_store.list.assert_called_once_with(
+            filters={'user_id': 'test_user'}, limit=10000
+        )
+        delete = manager.memory.vector_store.client.delete
+        delete.assert_called_once()
+        assert delete.call_args.kwargs['collection_name'] == 'test_memories'
+        selector = delete.call_args.kwargs['points_selector']
+        assert isinstance(selector, models.FilterSelector)
+        assert selector.filter.must[0].match.value == 'test_user'
+        manager.memory.get_all.assert_not_called()
+        manager.memory.delete_all.assert_not_called()
+        manager.memory.delete.assert_not_called()
+        assert manager._corpus_nonempty['test_user'][0] is False
+
+    def test_reset_memories_repeats_paged_bulk_delete(self, memory_manager_with_mocks):
+        """Test that reset keeps calling delete_all while it only removes one page."""
+        manager = memory_manager_with_mocks
+        manager.config['memory_config']['vector_store']['provider'] = 'chroma'
+        stored = [f'memory-{i}' for i in range(250)]
+        manager.memory.vector_store.list.side_effect = (
+            lambda filters, limit: ([Mock(id=memory_id) for memory_id in stored[:limit]], None)
+        )
+        manager.memory.delete_all.side_effect = lambda user_id: stored.__delitem__(slice(0, 100))
+
+        deleted_count = manager.reset_memories("test_user")
+
+        assert deleted_count == 250
+        assert stored == []
+        assert manager.memory.delete_all.call_count == 3
+        limits = [call.kwargs['limit'] for call in manager.memory.vector_store.list.call_args_list]
+        assert limits == [10000, 1, 1, 1]
+
+    def test_reset_memories_reports_only_removed(self, memory_manager_with_mocks):
+        """Test that a stalled reset counts only the memories that were removed."""
+        manager = memory_manager_with_mocks
+        manager.config['memory_config']['vector_store']['provider'] = 'chroma'
+        manager.memory.vector_store.list.side_effect = [
+            ([Mock(id='kept'), Mock(id='gone')], None),
+            ([Mock(id='kept')], None),
+            ([Mock(id='kept')], None),
+            ([Mock(id='kept')], None),
+        ]
+
+        deleted_count = manager.reset_memories("test_user")
+
+        assert deleted_count == 1
+        assert manager.memory.delete_all.call_count == 2
+        assert 'test_user' not in manager._corpus_nonempty
+
+    def test_reset_memories_filtered_delete_failure(self, memory_manager_with_mocks):
+        """Test that a failed Qdrant filtered delete falls back to mem0's delete_all."""
+        manager = memory_manager_with_mocks
+        manager.memory.vector_store.client.delete.side_effect = Exception("timeout")
+        manager.memory.vector_store.list.side_effect = [
+            ([Mock(id='test-memory-id')], None), ([], None)
+        ]
+
+        deleted_count = manager.reset_memories("test_user")
+
+        assert deleted_count == 1
+        manager.memory.delete_all.assert_called_once_with(user_id="test_user")
+
+    def test_reset_memories_listing_fallback(self, memory_manager_with_mocks):
+        """Test reset lists IDs through get_all when the store cannot list."""
+        memory_manager_with_mocks.memory.vector_store.list.side_effect = TypeError("unsupported")
+
+        deleted_count = memory_manager_with_mocks.reset_memories("test_user")
+
+        assert deleted_count == 1
+        memory_manager_with_mocks.memory.get_all.assert_called_once_with(user_id="test_user", limit=10000)
+
+    def test_reset_memories_without_bulk_delete(self, memory_manager_with_mocks):
+        """Test reset falls back to per-memory deletes without delete_all."""
+        manager = memory_manager_with_mocks
+        manager.config['memory_config']['vector_store']['provider'] = 'chroma'
+        del manager.memory.delete_all
+        manager.memory.vector_store.list.side_effect = [
+            ([Mock(id='test-memory-id')], None), ([], None)
+        ]
+
+        deleted_count = manager.reset_memories("test_user")
+
+        assert deleted_count == 1
+        manager.memory.delete.assert_called_once_with(memory_id="test-memory-id")
     
     def test_reset_memories_no_memories(self, memory_manager_with_mocks):
         """Test reset when no memories exist."""
-        memory_manager_with_mocks.memory.get_all.return_value = {'results': []}
+        memory_manager_with_mocks.memory.vector_store.list.return_value = ([], None)
         
         deleted_count = memory_manager_with_mocks.reset_memories("test_user")
         
         assert deleted_count == 0
         memory_manager_with_mocks.memory.delete.assert_not_called()
+        memory_manager_with_mocks.memory.delete_all.assert_not_called()
     
     def test_reset_memories_default_user(self, memory_manager_with_mocks):
         """Test reset with default user ID."""
         deleted_count = memory_manager_with_mocks.reset_memories()
         
         assert deleted_count == 1
-        memory_manager_with_mocks.memory.get_all.assert_called_once_with(user_id="test_user")
+        memory_manager_with_mocks.memory.vector_store.list.assert_called_once_with(
+            filters={'user_id': 'test_user'}, limit=10000
+        )